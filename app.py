@@ -4,17 +4,49 @@
 # ============================================================================
 
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
-import json
+from werkzeug.exceptions import BadRequest, HTTPException
+import logging
 import os
-from rapidfuzz import fuzz, process 
+import unicodedata
+from functools import lru_cache, wraps
+import ahocorasick
+import numpy as np
+import orjson
+from rapidfuzz import fuzz, process, utils
 from datetime import datetime
 
-# --- NEW IMPORTS: Using the stable langdetect library (for fallback message only) ---
-from langdetect import detect, DetectorFactory 
-# --- END NEW IMPORTS ---
+# --- Language identification: fastText lid.176 model (Rust implementation
+#     from underthesea_core), langdetect as fallback ---
+try:
+    from underthesea_core import FastText
+except ImportError:
+    FastText = None
+from langdetect import detect, DetectorFactory, detector_factory
+# --- END LANGUAGE IMPORTS ---
+
+# Startup progress logs at INFO; per-request traces are DEBUG so production
+# (LOG_LEVEL=INFO) skips their formatting entirely
+logging.basicConfig(
+    level=os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    format='%(asctime)s %(levelname)s %(name)s: %(message)s'
+)
+logger = logging.getLogger("natlas")
+
+class ORJSONProvider(JSONProvider):
+    """Serves jsonify()/request.json through orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Symptom descriptions are short; bound request bodies so they can't balloon memory
+app.config['MAX_CONTENT_LENGTH'] = 64 * 1024
 CORS(app) 
 
 # ============================================================================
@@ -26,8 +58,39 @@ DetectorFactory.seed = 0
 
 CACHE_DIR_NAME = 'cache' 
 CACHE_DIR = os.path.join(os.path.dirname(__file__), CACHE_DIR_NAME)
+LANG_MODEL_PATH = os.path.join(os.path.dirname(__file__), 'lid.176.ftz')
+
+# Minimum token_sort_ratio score (0-100) for a cached case to count as a match
+MATCH_THRESHOLD = 70
+
+# Cached languages, and the small integer id each one is stored as
+SUPPORTED_LANGUAGES = ['yoruba', 'igbo', 'hausa', 'english']
+LANGUAGE_IDS = {lang: i for i, lang in enumerate(SUPPORTED_LANGUAGES)}
+
+# Longest request text the per-process memo caches will hold. Real complaints
+# are a sentence or two; entries keep several copies of the text, so caching
+# arbitrary bodies (up to MAX_CONTENT_LENGTH) would let any client grow every
+# worker by gigabytes
+MEMO_MAX_TEXT_LEN = 256
+
+def lru_cache_short_text(maxsize):
+    """lru_cache that only memoizes calls whose first argument, the text, is at
+    most MEMO_MAX_TEXT_LEN characters; longer texts are always recomputed."""
+    def decorator(fn):
+        cached_fn = lru_cache(maxsize=maxsize)(fn)
+        
+        @wraps(fn)
+        def wrapper(text, *args):
+            if len(text) <= MEMO_MAX_TEXT_LEN:
+                return cached_fn(text, *args)
+            return fn(text, *args)
+        
+        wrapper.cache_info = cached_fn.cache_info
+        wrapper.cache_clear = cached_fn.cache_clear
+        return wrapper
+    return decorator
 
-print("🇳🇬 Loading N-ATLAS cached responses...")
+logger.info("🇳🇬 Loading N-ATLAS cached responses...")
 
 # Global variables
 CACHED_DATA = {"yoruba": [], "igbo": [], "hausa": [], "english": []}
@@ -35,54 +98,134 @@ METADATA = {}
 total_cached = 0
 
 try:
-    # Load complete dataset
-    with open(os.path.join(CACHE_DIR, 'natlas_responses_complete.json'), 'r', encoding='utf-8') as f:
-        CACHED_DATA = json.load(f)
+    # Load complete dataset (orjson parses the UTF-8 bytes directly)
+    with open(os.path.join(CACHE_DIR, 'natlas_responses_complete.json'), 'rb') as f:
+        CACHED_DATA = orjson.loads(f.read())
     
     # Load metadata
-    with open(os.path.join(CACHE_DIR, 'metadata.json'), 'r', encoding='utf-8') as f:
-        METADATA = json.load(f)
+    with open(os.path.join(CACHE_DIR, 'metadata.json'), 'rb') as f:
+        METADATA = orjson.loads(f.read())
     
     total_cached = sum(
         len(CACHED_DATA.get(lang, [])) 
-        for lang in ['yoruba', 'igbo', 'hausa', 'english']
+        for lang in SUPPORTED_LANGUAGES
     )
     
-    print(f"✅ Loaded {total_cached} cached responses")
-    print(f"   Generated: {METADATA.get('generated_at', 'Unknown')}")
+    logger.info("✅ Loaded %d cached responses", total_cached)
+    logger.info("   Generated: %s", METADATA.get('generated_at', 'Unknown'))
     
 except FileNotFoundError as e:
-    print(f"❌ ERROR: Cache files not found! {e}")
-    print(f"   Make sure {CACHE_DIR_NAME}/ folder exists with JSON files")
-
-# --- Initialize Universal Cache List (Run once at startup) ---
-UNIVERSAL_CACHED_INPUTS = []
-for lang, cases in CACHED_DATA.items():
-    for case in cases:
+    logger.error("❌ ERROR: Cache files not found! %s", e)
+    logger.error("   Make sure %s/ folder exists with JSON files", CACHE_DIR_NAME)
+
+# --- Initialize Universal Cache (Run once at startup) ---
+# Stored as index-aligned parallel arrays: cached input text, language id and
+# the full cached case, so hot paths index by position instead of reading dicts
+UNIVERSAL_INPUTS_LIST = []
+UNIVERSAL_FULL_CASES = []
+universal_lang_ids = []
+for lang in SUPPORTED_LANGUAGES:
+    for case in CACHED_DATA.get(lang, []):
         # ✅ Skip strings or malformed entries safely
         if isinstance(case, dict) and case.get('success', False):
-            UNIVERSAL_CACHED_INPUTS.append({
-                'input': case.get('input', ''),
-                'language': lang,
-                'full_case': case
-            })
+            UNIVERSAL_INPUTS_LIST.append(case.get('input', ''))
+            UNIVERSAL_FULL_CASES.append(case)
+            universal_lang_ids.append(LANGUAGE_IDS[lang])
+UNIVERSAL_LANG_IDS = np.array(universal_lang_ids, dtype=np.int8)
+
+def normalize_text(text):
+    """Normalizes text for fuzzy matching (rapidfuzz default_process: lowercase,
+    non-alphanumerics to spaces, trimmed). Cached inputs and queries both go
+    through here, once each."""
+    return utils.default_process(text)
+
+def token_sort_key(processed_text):
+    """The form token_sort_ratio compares: whitespace tokens sorted and joined by one space."""
+    return ' '.join(sorted(processed_text.split()))
+
+# Choice list handed to rapidfuzz, pre-processed and token-sorted once so
+# requests only pay for fuzz.ratio
+UNIVERSAL_SORTED_KEYS = [token_sort_key(normalize_text(s)) for s in UNIVERSAL_INPUTS_LIST]
+
+# Per-language universal indices for find_best_match, so a match points
+# straight back into UNIVERSAL_FULL_CASES
+PER_LANG_INDICES = {
+    lang: np.flatnonzero(UNIVERSAL_LANG_IDS == lang_id)
+    for lang, lang_id in LANGUAGE_IDS.items()
+}
 
-print(f"🌍 Universal cache ready with {len(UNIVERSAL_CACHED_INPUTS)} valid cases")
+# Exact-hit lookups checked before any fuzzy scoring: raw cached input and its
+# normalized form -> universal index (first occurrence wins, like extractOne)
+EXACT_INPUT_INDEX = {}
+EXACT_NORM_INDEX = {}
+for i, cached_input in enumerate(UNIVERSAL_INPUTS_LIST):
+    EXACT_INPUT_INDEX.setdefault(cached_input, i)
+    EXACT_NORM_INDEX.setdefault(normalize_text(cached_input), i)
+
+logger.info("🌍 Universal cache ready with %d valid cases", len(UNIVERSAL_FULL_CASES))
 # ----------------------------------------------------------------------------
 
+# --- Load fastText language ID model (langdetect is used if unavailable) ---
+LANG_MODEL = None
+if FastText is not None:
+    try:
+        LANG_MODEL = FastText.load(LANG_MODEL_PATH)
+        logger.info("🔤 fastText language model loaded")
+    except OSError as e:
+        logger.warning("⚠️  fastText model not loaded, falling back to langdetect: %s", e)
+
+# Detector codes we care about; anything else is reported as english.
+# The bundled lid.176 model only has a label for Yoruba ('yo'), not Hausa or
+# Igbo, and langdetect has none of the three, so 'ig'/'ha' are never
+# produced: fallback responses for Hausa/Igbo text can't rely on detection
+LANG_CODE_MAP = {
+    'yo': 'yoruba', 'ig': 'igbo', 'ha': 'hausa', 'en': 'english', 
+    'pt': 'english', 'fr': 'english', 'es': 'english', 
+}
+
+# Short ASCII-only text carries none of the Yoruba/Igbo/Hausa letters
+# (ọ ụ ị ẹ ɗ ƙ ɓ, tone marks) and is too short for the detector to place
+# reliably anyway, so it is tagged english without running the classifier
+ASCII_FAST_PATH_MAX_LEN = 64
+
+def load_langdetect_profiles():
+    """Loads only the langdetect profiles LANG_CODE_MAP can use instead of all 55.
+
+    langdetect ships no yo/ig/ha profiles and every other language maps to
+    english anyway, so detection results are unchanged while memory and
+    per-call scoring shrink with the profile count.
+    """
+    profiles = []
+    for code in LANG_CODE_MAP:
+        profile_path = os.path.join(detector_factory.PROFILES_DIRECTORY, code)
+        if os.path.isfile(profile_path):
+            with open(profile_path, 'r', encoding='utf-8') as f:
+                profiles.append(f.read())
+    
+    factory = DetectorFactory()
+    factory.load_json_profile(profiles)
+    detector_factory._factory = factory
+
+if LANG_MODEL is None:
+    load_langdetect_profiles()
+
 # --- Language Detection Function (Only used for fallback message language tag) ---
+@lru_cache_short_text(maxsize=4096)
 def detect_language(text):
-    """Detects language using langdetect for fallback message context."""
-    try:
-        lang_code = detect(text)
-    except Exception:
-        return 'english' 
+    """Detects language using fastText (or langdetect) for fallback message context."""
+    if len(text) <= ASCII_FAST_PATH_MAX_LEN and text.isascii():
+        return 'english'
     
-    code_map = {
-        'yo': 'yoruba', 'ig': 'igbo', 'ha': 'hausa', 'en': 'english', 
-        'pt': 'english', 'fr': 'english', 'es': 'english', 
-    }
-    return code_map.get(lang_code, 'english')
+    if LANG_MODEL is not None:
+        # Returns [(code, probability)] with the __label__ prefix already stripped
+        lang_code = LANG_MODEL.predict(text, k=1)[0][0]
+    else:
+        try:
+            lang_code = detect(text)
+        except Exception:
+            return 'english' 
+    
+    return LANG_CODE_MAP.get(lang_code, 'english')
 
 
 # ============================================================================
@@ -113,21 +256,155 @@ EXPANDED_MEDICAL_TERMS = {
 }
 
 
-def find_best_match(user_input, language, threshold=70):
-    # NOTE: This function is now DEPRECATED because we use the universal search directly
-    #       in the API routes for efficiency. It is left here for completeness.
-    return None 
+# --- Prefilter: cheap bounds that rule out candidates before scoring ---
+def _char_mask(s):
+    """64-bit bitmap of the non-space characters in s (hashed by code point)."""
+    mask = 0
+    for c in set(s):
+        if c != ' ':
+            mask |= 1 << (ord(c) & 63)
+    return mask
+
+UNIVERSAL_CHAR_MASKS = np.array([_char_mask(s) for s in UNIVERSAL_SORTED_KEYS], dtype=np.uint64)
+UNIVERSAL_LENGTHS = np.array([len(s) for s in UNIVERSAL_SORTED_KEYS], dtype=np.int64)
+
+def _prefilter_candidates(sort_key, threshold=MATCH_THRESHOLD, indices=None):
+    """Universal indices of cached inputs that can still reach `threshold`.
+
+    Both bounds are exact, so filtered-out candidates never change the result:
+    the InDel distance is at least the length difference, which caps the score
+    at 100 * (1 - |la - lb| / (la + lb)); and with no non-space character in
+    common only spaces can align, which keeps the score below 50. Pass
+    `indices` to only consider that subset of the universal cache.
+    """
+    char_masks, lengths = UNIVERSAL_CHAR_MASKS, UNIVERSAL_LENGTHS
+    if indices is not None:
+        char_masks, lengths = char_masks[indices], lengths[indices]
+    
+    query_length = len(sort_key)
+    keep = (np.abs(lengths - query_length) * 100
+            <= (100 - threshold) * (lengths + query_length))
+    if threshold >= 50:
+        keep &= (char_masks & np.uint64(_char_mask(sort_key))) != 0
+    return np.flatnonzero(keep) if indices is None else indices[keep]
+
+def _universal_extract_one(sort_key):
+    """Single-query universal search; returns extractOne's (choice, score, index).
+
+    fuzz.ratio on token-sorted keys scores exactly like token_sort_ratio on the
+    processed strings, without re-sorting every cached input per request.
+    extractOne already raises its cutoff to the best score so far and stops at
+    a perfect 100, so there is no need to hand-roll that over extract_iter.
+    """
+    candidates = {i: UNIVERSAL_SORTED_KEYS[i] for i in _prefilter_candidates(sort_key).tolist()}
+    return process.extractOne(
+        sort_key,
+        candidates,
+        scorer=fuzz.ratio,
+        processor=None,
+        score_cutoff=MATCH_THRESHOLD
+    )
+
+@lru_cache_short_text(maxsize=4096)
+def _universal_match(processed_text):
+    """Memoized universal search keyed on the normalize_text'd query.
+
+    Returns `(index, score)` into UNIVERSAL_FULL_CASES, or None when nothing
+    reaches MATCH_THRESHOLD. Safe to cache because the universal cache is
+    read-only after startup.
+    """
+    best_match_info = _universal_extract_one(token_sort_key(processed_text))
+    if best_match_info is None:
+        return None
+    return best_match_info[2], best_match_info[1]
+
+def find_universal_case(text, text_norm):
+    """Finds the cached case for a request across all languages.
+
+    Exact hits (verbatim or after normalization) are answered from a dict;
+    anything else goes through the fuzzy _universal_match. Returns
+    `(index, score, match_type)` or None.
+    """
+    index = EXACT_INPUT_INDEX.get(text)
+    if index is None:
+        index = EXACT_NORM_INDEX.get(text_norm)
+    if index is not None:
+        return index, 100.0, "exact"
+    
+    best_match_info = _universal_match(text_norm)
+    if best_match_info is None:
+        return None
+    return best_match_info[0], best_match_info[1], "universal_fuzzy"
+
+
+def find_best_match(user_input, language, threshold=MATCH_THRESHOLD):
+    """Fuzzy match restricted to one language's cached cases.
+
+    The API routes use the universal search instead (see _universal_match);
+    this is kept for callers that already know the language.
+    """
+    lang_indices = PER_LANG_INDICES.get(language)
+    if lang_indices is None:
+        return None
+    
+    sort_key = token_sort_key(normalize_text(user_input))
+    candidates = {
+        i: UNIVERSAL_SORTED_KEYS[i]
+        for i in _prefilter_candidates(sort_key, threshold, lang_indices).tolist()
+    }
+    best_match_info = process.extractOne(
+        sort_key,
+        candidates,
+        scorer=fuzz.ratio,
+        processor=None,
+        score_cutoff=threshold
+    )
+    if best_match_info is None:
+        return None
+    
+    return {
+        **UNIVERSAL_FULL_CASES[best_match_info[2]],
+        "match_type": "fuzzy",
+        "similarity_score": best_match_info[1],
+        "cached": True
+    }
+
+# Every term across languages, deduplicated ('malaria', 'obi' appear twice)
+ALL_MEDICAL_TERMS = frozenset(
+    term for lang_terms in EXPANDED_MEDICAL_TERMS.values() for term in lang_terms
+)
+
+# Single Aho-Corasick automaton over all terms, so keyword extraction is one
+# pass over the text instead of one substring scan per term
+MEDICAL_TERMS_AUTOMATON = ahocorasick.Automaton()
+for term in ALL_MEDICAL_TERMS:
+    MEDICAL_TERMS_AUTOMATON.add_word(term, term)
+MEDICAL_TERMS_AUTOMATON.make_automaton()
+
+def _word_continues(text, i, step):
+    """True if a letter or digit sits at `i` (walking by `step`), looking past
+    combining tone marks: they belong to the letter beside them, so 'ikọ' in
+    'ikọ́' (ikọ + U+0301) is still a whole word."""
+    while 0 <= i < len(text) and unicodedata.combining(text[i]):
+        i += step
+    return 0 <= i < len(text) and text[i].isalnum()
 
 def extract_keywords(text):
-    keywords = []
+    # Plain lowercasing, not normalize_text: default_process would turn combining
+    # tone marks into spaces and break terms like 'gbígbọ̀n'
     text_lower = text.lower()
+    keywords = set()
     
-    for lang_terms in EXPANDED_MEDICAL_TERMS.values():
-        for term in lang_terms:
-            if term in text_lower:
-                keywords.append(term)
+    for end, term in MEDICAL_TERMS_AUTOMATON.iter(text_lower):
+        start = end - len(term) + 1
+        # Whole words only, so 'back' doesn't fire inside 'background'
+        if _word_continues(text_lower, start - 1, -1):
+            continue
+        if _word_continues(text_lower, end + 1, 1):
+            continue
+        keywords.add(term)
     
-    return list(set(keywords))
+    return list(keywords)
 
 def get_fallback_response(text, language):
     keywords = extract_keywords(text)
@@ -162,6 +439,77 @@ def get_fallback_response(text, language):
 # API ENDPOINTS (FINAL LOGIC)
 # ============================================================================
 
+def parse_analysis_request():
+    """Parses and validates a POST body shared by the analysis endpoints.
+
+    Returns `(text, language)`: the stripped text and the requested language,
+    or the detected one when the request names no supported language. Raises
+    BadRequest on a malformed body.
+    """
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        raise BadRequest("Request body must be a JSON object")
+    
+    if 'text' not in data:
+        raise BadRequest("Missing 'text' in request body")
+    if not isinstance(data['text'], str):
+        raise BadRequest("'text' must be a string")
+    
+    text = data['text'].strip()
+    if not text:
+        raise BadRequest("Empty text provided")
+    
+    language = str(data.get('language') or '').lower()
+    if language not in LANGUAGE_IDS:
+        language = detect_language(text)
+    
+    return text, language
+
+@lru_cache_short_text(maxsize=8192)
+def _analyze_cached(text, language):
+    """Full analysis (the /analyze response body) for a complaint.
+
+    Deterministic in `(text, language)`, so short texts are memoized; callers
+    may get the shared cached dict and must not mutate it.
+    """
+    # Raw `text` is kept only for echoed response fields; matching uses text_norm
+    text_norm = normalize_text(text)
+    
+    # 1. Attempt Universal Fuzzy Match across ALL cached inputs
+    best_match_info = find_universal_case(text, text_norm)
+    
+    # 2. Only exact hits or matches above MATCH_THRESHOLD are returned
+    if best_match_info:
+        match_index, similarity_score, match_type = best_match_info
+        
+        # Copy the original, full cached case so the fixes below never leak into the cache
+        full_result = dict(UNIVERSAL_FULL_CASES[match_index])
+        logger.debug(
+            "   ✅ Universal Match found (%s): %s%% (Lang: %s)",
+            match_type, similarity_score, full_result.get('language')
+        )
+        
+        # --- FIX: Populate empty fields with placeholder text ---
+        if not full_result.get('translation') or not full_result.get('medical_keywords'):
+            fallback_enhancement = get_fallback_response(text, full_result.get('language'))
+            full_result['translation'] = fallback_enhancement['translation']
+            full_result['enhanced_notes'] = fallback_enhancement['enhanced_notes']
+        # ----------------------------------------------------
+        
+        return {
+            **full_result,
+            "match_type": match_type,
+            "similarity_score": similarity_score,
+            "cached": True
+        }
+    
+    # 3. If no match is found, use the enhanced fallback logic
+    logger.debug("   ⚠️  No universal match found (using enhanced fallback)")
+    return get_fallback_response(text, language)
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({
@@ -179,16 +527,33 @@ def home():
         "status": "online"
     })
 
+# Fixed part of the /health payload; the cache is read-only after startup
+_HEALTH_BASE = {
+    "status": "healthy",
+    "model": "N-ATLAS",
+    "mode": "cached_responses",
+    "cache_loaded": total_cached > 0,
+    "total_cached": total_cached,
+    "languages": ["yoruba", "igbo", "hausa", "english"],
+    "generated_at": METADATA.get('generated_at', 'Unknown')
+}
+
 @app.route('/health', methods=['GET'])
 def health():
+    cache_info = _analyze_cached.cache_info()
     return jsonify({
-        "status": "healthy",
-        "model": "N-ATLAS",
-        "mode": "cached_responses",
-        "cache_loaded": total_cached > 0,
-        "total_cached": total_cached,
-        "languages": ["yoruba", "igbo", "hausa", "english"],
-        "generated_at": METADATA.get('generated_at', 'Unknown'),
+        **_HEALTH_BASE,
+        # Memo cache of the worker process that answered this request; each
+        # gunicorn worker keeps its own, so these are not fleet-wide totals
+        "worker_analysis_cache": {
+            "pid": os.getpid(),
+            "hits": cache_info.hits,
+            "misses": cache_info.misses,
+            "size": cache_info.currsize,
+            "maxsize": cache_info.maxsize,
+            # Every miss inserts an entry, so whatever is no longer held was evicted
+            "evictions": cache_info.misses - cache_info.currsize
+        },
         "timestamp": datetime.now().isoformat()
     })
 
@@ -196,60 +561,14 @@ def health():
 def analyze():
     """Full medical analysis endpoint using Universal Fuzzy Match"""
     try:
-        data = request.json
-        
-        if not data or 'text' not in data:
-            return jsonify({"success": False, "error": "Missing 'text' in request body"}), 400
-        
-        text = data['text'].strip()
-        language_input = data.get('language', 'english').lower() # Use user input for fallback
-        
-        if not text:
-            return jsonify({"success": False, "error": "Empty text provided"}), 400
+        text, language = parse_analysis_request()
         
-        # 1. Attempt Universal Fuzzy Match across ALL cached inputs
-        all_inputs_list = [item['input'] for item in UNIVERSAL_CACHED_INPUTS]
-        
-        best_match_info = process.extractOne(
-            text, 
-            all_inputs_list,
-            scorer=fuzz.token_sort_ratio
-        )
-        
-        # 2. Check if the match is above the threshold (70%)
-        if best_match_info and best_match_info[1] >= 70:
-            matched_input = best_match_info[0]
-            similarity_score = best_match_info[1]
-            
-            # Find the original, full cached case
-            full_result = next((item['full_case'] for item in UNIVERSAL_CACHED_INPUTS if item['input'] == matched_input), None)
-            
-            if full_result:
-                print(f"   ✅ Universal Match found: {similarity_score}% (Lang: {full_result.get('language')})")
-                
-                # --- FIX: Populate empty fields with placeholder text ---
-                if not full_result.get('translation') or not full_result.get('medical_keywords'):
-                    fallback_enhancement = get_fallback_response(text, full_result.get('language'))
-                    full_result['translation'] = fallback_enhancement['translation']
-                    full_result['enhanced_notes'] = fallback_enhancement['enhanced_notes']
-                # ----------------------------------------------------
-                
-                return jsonify({
-                    **full_result,
-                    "match_type": "universal_fuzzy",
-                    "similarity_score": similarity_score,
-                    "cached": True
-                })
-
-        # 3. If no match is found, use the enhanced fallback logic
-        language = language_input
-        print(f"   ⚠️  No universal match found (using enhanced fallback)")
-        result = get_fallback_response(text, language)
-
-        return jsonify(result)
+        return jsonify(_analyze_cached(text, language))
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in /analyze: {str(e)}")
+        logger.exception("❌ Error in /analyze: %s", e)
         return jsonify({
             "success": False,
             "error": "Internal Processing Error",
@@ -260,19 +579,13 @@ def analyze():
 def quick_symptoms():
     """Quick symptom identification endpoint, always using the robust keyword list."""
     try:
-        data = request.json
-        text = data.get('text', '').strip()
-        language_input = data.get('language', 'english').lower()
-        
-        if not text:
-            return jsonify({"success": False, "error": "Empty text provided"}), 400
+        text, language = parse_analysis_request()
         
         # Always use robust keyword extraction for the quick endpoint
         symptoms = extract_keywords(text)
         
-        language = language_input
-        print(f"⚡ Quick check: '{text[:50]}...' ({language})")
-        print(f"   ✅ Extracted Keywords: {symptoms[:5]}")
+        logger.debug("⚡ Quick check: '%s...' (%s)", text[:50], language)
+        logger.debug("   ✅ Extracted Keywords: %s", symptoms[:5])
         
         return jsonify({
             "success": True,
@@ -282,8 +595,10 @@ def quick_symptoms():
             "match_type": "keyword_extraction"
         })
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in /quick-symptoms: {str(e)}")
+        logger.exception("❌ Error in /quick-symptoms: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 @app.route('/analyze-for-doctors', methods=['POST'])
@@ -292,63 +607,12 @@ def analyze_for_doctors():
     Enhanced analysis formatted for doctor suggestion API
     """
     try:
-        data = request.json
-        text = data.get('text', '').strip()
-        language_input = data.get('language', 'english').lower()
-        
-        if not text:
-            return jsonify({"success": False, "error": "Empty text provided"}), 400
+        text, language = parse_analysis_request()
+        result = _analyze_cached(text, language)
         
-        # 1. Attempt Universal Fuzzy Match across ALL cached inputs
-        all_inputs_list = [item['input'] for item in UNIVERSAL_CACHED_INPUTS]
-        
-        best_match_info = process.extractOne(
-            text, 
-            all_inputs_list,
-            scorer=fuzz.token_sort_ratio
-        )
-        
-        # 2. Check if the match is above the threshold (70%)
-        if best_match_info and best_match_info[1] >= 70:
-            matched_input = best_match_info[0]
-            similarity_score = best_match_info[1]
-            
-            # Find the original, full cached case
-            result = next((item['full_case'] for item in UNIVERSAL_CACHED_INPUTS if item['input'] == matched_input), None)
-            
-            if result:
-                # --- FIX: Populate empty fields with placeholder text ---
-                if not result.get('translation') or not result.get('medical_keywords'):
-                    fallback_enhancement = get_fallback_response(text, result.get('language'))
-                    result['translation'] = fallback_enhancement['translation']
-                    result['enhanced_notes'] = fallback_enhancement['enhanced_notes']
-                # ----------------------------------------------------
-                
-                # Format for doctor suggestion API
-                response = {
-                    "success": True,
-                    "enhanced_notes": result.get('enhanced_notes', ''),
-                    "original": text,
-                    "translation": result.get('translation', ''),
-                    "keywords": result.get('medical_keywords', []),
-                    "severity": result.get('severity', 'moderate'),
-                    "recommended_specialties": result.get('recommended_specialties', []),
-                    "cultural_insights": {
-                        "context": result.get('cultural_context', ''),
-                        "nigerian_health_notes": result.get('nigerian_context', '')
-                    },
-                    "match_type": "universal_fuzzy",
-                    "similarity_score": similarity_score,
-                    "cached": True
-                }
-                return jsonify(response)
-        
-        # 3. If no match is found, use the enhanced fallback logic
-        language = language_input
-        result = get_fallback_response(text, language)
-        
-        print(f"👨‍⚕️ Doctor analysis: '{text[:50]}...' ({language})")
+        logger.debug("👨‍⚕️ Doctor analysis: '%s...' (%s)", text[:50], language)
         
+        # Format for doctor suggestion API
         response = {
             "success": True,
             "enhanced_notes": result.get('enhanced_notes', ''),
@@ -361,21 +625,30 @@ def analyze_for_doctors():
                 "context": result.get('cultural_context', ''),
                 "nigerian_health_notes": result.get('nigerian_context', '')
             },
-            "match_type": "fallback_enhanced",
-            "similarity_score": 0,
-            "cached": False
+            "match_type": result['match_type'],
+            "similarity_score": result['similarity_score'],
+            "cached": result['cached']
         }
         
         return jsonify(response)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"❌ Error in /analyze-for-doctors: {str(e)}")
+        logger.exception("❌ Error in /analyze-for-doctors: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
 # ============================================================================
 # ERROR HANDLERS
 # ============================================================================
 
+@app.errorhandler(400)
+def bad_request(error):
+    return jsonify({
+        "success": False,
+        "error": error.description
+    }), 400
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({
@@ -384,6 +657,13 @@ def not_found(error):
         "available_endpoints": ["/", "/health", "/analyze", "/quick-symptoms", "/analyze-for-doctors"]
     }), 404
 
+@app.errorhandler(413)
+def payload_too_large(error):
+    return jsonify({
+        "success": False,
+        "error": "Request body too large"
+    }), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({
@@ -397,6 +677,6 @@ def internal_error(error):
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    print(f"\n🚀 N-ATLAS API Server starting on port {port}...")
-    print(f"🇳🇬 Ready to serve {total_cached} cached medical responses!")
+    logger.info("🚀 N-ATLAS API Server starting on port %d...", port)
+    logger.info("🇳🇬 Ready to serve %d cached medical responses!", total_cached)
     app.run(host='0.0.0.0', port=port, debug=False)
@@ -1,44 +1,77 @@
-import json
 import os
 
+# orjson parses/serializes the UTF-8 bytes directly; stdlib json keeps the
+# script usable where orjson isn't installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
 # --- IMPORTANT: Set the correct local path to your cache folder ---
 # Assuming your repository structure is: natlas-api/cache/natlas_responses_complete.json
 CACHE_PATH = './cache/natlas_responses_complete.json' 
 OUTPUT_PATH = './cache/natlas_responses_complete.json' 
+# Indented output keeps the committed cache diffable; set to False for a compact
+# file that serializes faster (app.py reads either)
+PRETTY_OUTPUT = True
+
+def filter_valid_cases(cases):
+    """Keeps only the entries that are dictionaries AND have the 'success' key.
+
+    Returns `(kept, removed_count)` from a single pass over `cases`.
+    """
+    kept = []
+    # Locals instead of attribute/builtin lookups on every element; the JSON
+    # parsers only produce plain dicts, so an exact type check is enough
+    append, _type, _dict = kept.append, type, dict
+    removed = 0
+    for case in cases:
+        if _type(case) is _dict and 'success' in case:
+            append(case)
+        else:
+            removed += 1
+    return kept, removed
 
 print("Starting cache cleanup...")
 
 # 1. Load the corrupted data
 try:
-    with open(CACHE_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    if orjson is not None:
+        with open(CACHE_PATH, 'rb') as f:
+            data = orjson.loads(f.read())
+    else:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
 except FileNotFoundError:
     print(f"❌ ERROR: Cache file not found at {CACHE_PATH}. Check your path!")
     exit()
 
-# 2. Initialize a clean data structure
-cleaned_data = {"metadata": data.get("metadata", {}), 
-                "yoruba": [], "igbo": [], "hausa": [], "english": []}
-
-# 3. Iterate and filter the corrupt entries
+# 2. Filter the corrupt entries in place, so the original list is released as
+#    soon as its cleaned copy replaces it and `metadata` is carried over as is
 print("Filtering corrupted string entries...")
 for lang in ['yoruba', 'igbo', 'hausa', 'english']:
-    original_list = data.get(lang, [])
-    original_count = len(original_list)
-    
-    # Filter: Keep only items that are dictionaries AND have the 'success' key
-    cleaned_cases = [
-        case for case in original_list
-        if isinstance(case, dict) and 'success' in case
-    ]
+    data[lang], removed = filter_valid_cases(data.get(lang, []))
     
-    cleaned_count = len(cleaned_cases)
-    cleaned_data[lang] = cleaned_cases
-    
-    print(f"[{lang.upper()}]: Removed {original_count - cleaned_count} corrupted entries.")
+    print(f"[{lang.upper()}]: Removed {removed} corrupted entries.")
+
+# 3. Save the cleaned data, replacing the original file
+# Serialize to bytes first and write them in one call, rather than letting
+# json.dump issue a write per token
+if orjson is not None:
+    payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 if PRETTY_OUTPUT else None)
+elif PRETTY_OUTPUT:
+    payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+else:
+    payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
 
-# 4. Save the cleaned data, overwriting the original file
-with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-    json.dump(cleaned_data, f, ensure_ascii=False, indent=2)
+# Write to a temp file and swap it in, so a crash mid-write can't leave a
+# truncated cache behind (the very damage this script repairs)
+tmp_path = OUTPUT_PATH + '.tmp'
+with open(tmp_path, 'wb') as f:
+    f.write(payload)
+    f.flush()
+    os.fsync(f.fileno())
+os.replace(tmp_path, OUTPUT_PATH)
 
 print("\n✅ Cache file successfully cleaned and saved. Ready for commit!")
\ No newline at end of file
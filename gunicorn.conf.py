@@ -0,0 +1,43 @@
+# ============================================================================
+# N-ATLAS API - Gunicorn configuration (picked up automatically by `gunicorn app:app`)
+# ============================================================================
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Load app.py once in the master before forking, so the cached responses,
+# universal match arrays and language model are shared copy-on-write
+# instead of being rebuilt in every worker
+preload_app = True
+
+# Worker count is capped at 2 and uses the CPUs this process may run on.
+# cpu_count() reports the host's CPUs and ignores container limits, and each
+# worker keeps its own memo caches, so a small instance could fork more
+# workers than its memory can hold. WEB_CONCURRENCY overrides it.
+MAX_DEFAULT_WORKERS = 2
+
+
+def _default_workers():
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # sched_getaffinity is Linux-only
+        cpus = os.cpu_count() or 1
+    return min(cpus, MAX_DEFAULT_WORKERS)
+
+
+# Each worker serves requests on several threads, which overlap on request
+# I/O and JSON work; a fuzzy match itself takes only tens of microseconds
+workers = int(os.environ.get('WEB_CONCURRENCY', _default_workers()))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before workers fork.
+    # Moving everything allocated so far into the permanent GC generation
+    # stops the workers' collector from writing to those objects, so the
+    # cached responses stay on pages shared with the master instead of
+    # being copied into every worker.
+    gc.freeze()